@@ -177,7 +177,7 @@ class Rig(object):
                     if step.startswith("*"):
                         continue
                     self.stopBuild = guide.helperSlots.runStep(
-                        step.split("|")[-1][1:], self.customStepDic)
+                        guide.stepPathFromText(step), self.customStepDic)
                 else:
                     pm.displayWarning("Build Stopped")
                     break
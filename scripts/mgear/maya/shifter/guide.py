@@ -1,15 +1,17 @@
 # Built-in
 import os
 import sys
-import imp
 import json
-import shutil
 import getpass
 import datetime
-import traceback
-import subprocess
 from functools import partial
 
+# use the faster ujson parser for .scs files when it is available
+try:
+    import ujson as _jsonLoader
+except ImportError:
+    _jsonLoader = json
+
 # pymel
 import pymel.core as pm
 from pymel.core import datatypes
@@ -34,6 +36,94 @@ TYPE = "mgear_guide_root"
 
 MGEAR_SHIFTER_CUSTOMSTEP_KEY = "MGEAR_SHIFTER_CUSTOMSTEP_PATH"
 
+# raw custom step string used by "New" custom step. %s is the step name
+CUSTOM_STEP_TEMPLATE = r'''
+import mgear.maya.shifter.customStep as cstp
+
+
+class CustomShifterStep(cstp.customShifterMainStep):
+    def __init__(self):
+        self.name = "%s"
+
+
+    def run(self, stepDict):
+        """Run method.
+
+            i.e:  stepDict["mgearRun"].global_ctl  gets the global_ctl from
+                    shifter rig on post step
+            i.e:  stepDict["otherCustomStepName"].ctlMesh  gets the ctlMesh
+                    from a previous custom step called "otherCustomStepName"
+        Arguments:
+            stepDict (dict): Dictionary containing the objects from
+                the previous steps
+
+        Returns:
+            None: None
+        """
+        return'''
+
+
+def _absPath(path):
+    """Absolute path, only resolving against the cwd for relative paths"""
+    if os.path.isabs(path):
+        return os.path.normpath(path)
+    return os.path.abspath(path)
+
+
+def _readFile(filePath):
+    with open(filePath, "r") as f:
+        return f.read()
+
+
+def _stepName(filePath):
+    """Custom step name from its file path, without the extension"""
+    return os.path.splitext(os.path.basename(filePath))[0]
+
+
+def stepPathFromText(text):
+    """Get the custom step path from its "name | path" list text
+
+    Arguments:
+        text (str): The custom step text, as stored in the guide
+
+    Returns:
+        str: The custom step path
+    """
+    return text[text.rfind("|") + 2:]
+
+
+def _customStepFullPath(stepPath, customStepPath=None):
+    """Full path of a custom step stored in the guide
+
+    Arguments:
+        stepPath (str): The step path, relative to the custom step env path
+            when the env path is set
+        customStepPath (str, optional): The custom step env path. If None,
+            it is read from the environment.
+
+    Returns:
+        str: The custom step file path
+    """
+    if customStepPath is None:
+        customStepPath = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+    if customStepPath:
+        # absolute step paths are returned as is by join
+        return os.path.join(customStepPath, stepPath)
+    return stepPath
+
+
+def _customStepBasePrefix(customStepPath):
+    """Normalized custom step env path, ending with a separator
+
+    Returns an empty string if the env path is not set.
+    """
+    if not customStepPath:
+        return ""
+    basePrefix = os.path.normcase(_absPath(customStepPath))
+    if not basePrefix.endswith(os.sep):
+        basePrefix += os.sep
+    return basePrefix
+
 
 class Main(object):
     """The main guide class
@@ -733,10 +823,12 @@ class HelperSlots(object):
         if itemsList and not itemsList[0]:
             listWidget.takeItem(0)
 
+        itemsSet = set(itemsList)
         for item in items:
-            if item.name() not in itemsList:
+            if item.name() not in itemsSet:
                 if item.hasAttr("isGearGuide"):
                     listWidget.addItem(item.name())
+                    itemsSet.add(item.name())
 
                 else:
                     pm.displayWarning(
@@ -751,8 +843,16 @@ class HelperSlots(object):
             self.updateListAttr(listWidget, targetAttr)
 
     def removeSelectedFromListWidget(self, listWidget, targetAttr=None):
-        for item in listWidget.selectedItems():
-            listWidget.takeItem(listWidget.row(item))
+        # remove from the last row so the pending rows stay valid
+        rows = sorted((listWidget.row(item)
+                       for item in listWidget.selectedItems()),
+                      reverse=True)
+        listWidget.setUpdatesEnabled(False)
+        try:
+            for row in rows:
+                listWidget.takeItem(row)
+        finally:
+            listWidget.setUpdatesEnabled(True)
         if targetAttr:
             self.updateListAttr(listWidget, targetAttr)
 
@@ -764,20 +864,30 @@ class HelperSlots(object):
         if itemsList and not itemsList[0]:
             targetAttrListWidget.takeItem(0)
 
-        for item in sourceListWidget.selectedItems():
-            targetListWidget.addItem(item.text())
-            sourceListWidget.takeItem(sourceListWidget.row(item))
+        # avoid a repaint per moved item
+        sourceListWidget.setUpdatesEnabled(False)
+        targetListWidget.setUpdatesEnabled(False)
+        try:
+            for item in sourceListWidget.selectedItems():
+                targetListWidget.addItem(item.text())
+                sourceListWidget.takeItem(sourceListWidget.row(item))
+        finally:
+            sourceListWidget.setUpdatesEnabled(True)
+            targetListWidget.setUpdatesEnabled(True)
 
         if targetAttr:
             self.updateListAttr(targetAttrListWidget, targetAttr)
 
     def copyFromListWidget(self, sourceListWidget, targetListWidget,
                            targetAttr=None):
-        targetListWidget.clear()
         itemsList = [i.text() for i in sourceListWidget.findItems(
             "", QtCore.Qt.MatchContains)]
-        for item in itemsList:
-            targetListWidget.addItem(item)
+        targetListWidget.setUpdatesEnabled(False)
+        try:
+            targetListWidget.clear()
+            targetListWidget.addItems(itemsList)
+        finally:
+            targetListWidget.setUpdatesEnabled(True)
         if targetAttr:
             self.updateListAttr(sourceListWidget, targetAttr)
 
@@ -785,7 +895,10 @@ class HelperSlots(object):
         """Update the string attribute with values separated by commas"""
         newValue = ",".join([i.text() for i in sourceListWidget.findItems(
             "", QtCore.Qt.MatchContains)])
-        self.root.attr(targetAttr).set(newValue)
+        attr = self.root.attr(targetAttr)
+        # skip the set, and its undo entry, when nothing changed
+        if attr.get() != newValue:
+            attr.set(newValue)
 
     def updateComponentName(self):
 
@@ -839,14 +952,11 @@ class HelperSlots(object):
         pyqt.deleteInstances(self, MayaQDockWidget)
 
     def editFile(self, widgetList):
+        import subprocess
         try:
-            filepath = widgetList.selectedItems()[0].text().split("|")[-1][1:]
-            if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-                editPath = os.path.join(
-                    os.environ.get(
-                        MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""), filepath)
-            else:
-                editPath = filepath
+            filepath = stepPathFromText(
+                widgetList.selectedItems()[0].text())
+            editPath = _customStepFullPath(filepath)
             if filepath:
                 if sys.platform.startswith('darwin'):
                     subprocess.call(('open', editPath))
@@ -861,20 +971,20 @@ class HelperSlots(object):
 
     @classmethod
     def runStep(self, stepPath, customStepDic):
+        import imp
         try:
             with pm.UndoChunk():
                 pm.displayInfo(
                     "EXEC: Executing custom step: %s" % stepPath)
-                fileName = os.path.split(stepPath)[1].split(".")[0]
-                if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-                    runPath = os.path.join(
-                        os.environ.get(
-                            MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""), stepPath)
-                else:
-                    runPath = stepPath
+                # a dotted module name would be loaded as a submodule of
+                # a missing package
+                fileName = _stepName(stepPath).replace(".", "_")
+                runPath = _customStepFullPath(stepPath)
                 customStep = imp.load_source(fileName, runPath)
-                if hasattr(customStep, "CustomShifterStep"):
-                    cs = customStep.CustomShifterStep()
+                customStepClass = getattr(
+                    customStep, "CustomShifterStep", None)
+                if customStepClass is not None:
+                    cs = customStepClass()
                     cs.run(customStepDic)
                     customStepDic[cs.name] = cs
                     pm.displayInfo(
@@ -886,6 +996,7 @@ class HelperSlots(object):
                         "Succeed!!" % stepPath)
 
         except Exception as ex:
+            import traceback
             template = "An exception of type {0} occured. "
             "Arguments:\n{1!r}"
             message = template.format(type(ex).__name__, ex.args)
@@ -915,7 +1026,7 @@ class HelperSlots(object):
     def runManualStep(self, widgetList):
         selItems = widgetList.selectedItems()
         for item in selItems:
-            self.runStep(item.text().split("|")[-1][1:], customStepDic={})
+            self.runStep(stepPathFromText(item.text()), customStepDic={})
 
 
 class GuideSettingsTab(QtWidgets.QDialog, guui.Ui_Form):
@@ -944,6 +1055,8 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
     whiteDownBrush.setColor('#E2E2E2')
     orangeBrush = QtGui.QBrush()
     orangeBrush.setColor('#e67e22')
+    highlightColor = QtGui.QColor(128, 128, 128, 255)
+    clearColor = QtGui.QColor(255, 255, 255, 0)
 
     def __init__(self, parent=None):
         self.toolName = TYPE
@@ -954,6 +1067,18 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
         # the inspectSettings function set the current selection to the
         # component root before open the settings dialog
         self.root = pm.selected()[0]
+        # list attributes waiting for a coalesced update. {attr: listWidget}
+        self._pendingListAttr = {}
+        # parented to the dialog, so it can't fire after the dialog is gone
+        self._listAttrTimer = QtCore.QTimer(self)
+        self._listAttrTimer.setSingleShot(True)
+        self._listAttrTimer.setInterval(0)
+        self._listAttrTimer.timeout.connect(self._flushListAttrUpdates)
+        # last search text highlighted on each custom step list
+        self._lastSearch = {}
+        # custom step context menu, built on first use
+        self.csMenu = None
+        self._csMenuTarget = None
 
         self.guideSettingsTab = guideSettingsTab()
         self.customStepTab = customStepTab()
@@ -1014,8 +1139,8 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
             self.guideSettingsTab.jointRig_checkBox, "joint_rig")
         self.populateAvailableSynopticTabs()
 
-        for item in self.root.attr("synoptic").get().split(","):
-            self.guideSettingsTab.rigTabs_listWidget.addItem(item)
+        self.guideSettingsTab.rigTabs_listWidget.addItems(
+            self.root.attr("synoptic").get().split(","))
 
         self.guideSettingsTab.L_color_fk_spinBox.setValue(
             self.root.attr("L_color_fk").get())
@@ -1033,15 +1158,31 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
         # pupulate custom steps sttings
         self.populateCheck(
             self.customStepTab.preCustomStep_checkBox, "doPreCustomStep")
-        for item in self.root.attr("preCustomStep").get().split(","):
-            self.customStepTab.preCustomStep_listWidget.addItem(item)
-        self.refreshStatusColor(self.customStepTab.preCustomStep_listWidget)
+        self.populateCustomStepList(
+            self.customStepTab.preCustomStep_listWidget, "preCustomStep")
 
         self.populateCheck(
             self.customStepTab.postCustomStep_checkBox, "doPostCustomStep")
-        for item in self.root.attr("postCustomStep").get().split(","):
-            self.customStepTab.postCustomStep_listWidget.addItem(item)
-        self.refreshStatusColor(self.customStepTab.postCustomStep_listWidget)
+        self.populateCustomStepList(
+            self.customStepTab.postCustomStep_listWidget, "postCustomStep")
+
+    def populateCustomStepList(self, cs_listWidget, targetAttr):
+        """Fill a custom step list widget from the guide attribute
+
+        The widget repaint is disabled while the items are added and
+        colored, so the list is drawn only once.
+
+        Arguments:
+            cs_listWidget (QListWidget): The custom step list widget
+            targetAttr (str): The guide attribute with the steps
+        """
+        cs_listWidget.setUpdatesEnabled(False)
+        try:
+            cs_listWidget.addItems(
+                self.root.attr(targetAttr).get().split(","))
+            self.refreshStatusColor(cs_listWidget)
+        finally:
+            cs_listWidget.setUpdatesEnabled(True)
 
     def create_layout(self):
         """
@@ -1206,15 +1347,45 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
     def eventFilter(self, sender, event):
         if event.type() == QtCore.QEvent.ChildRemoved:
             if sender == self.guideSettingsTab.rigTabs_listWidget:
-                self.updateListAttr(sender, "synoptic")
+                self.queueListAttrUpdate(sender, "synoptic")
             elif sender == self.customStepTab.preCustomStep_listWidget:
-                self.updateListAttr(sender, "preCustomStep")
+                self.queueListAttrUpdate(sender, "preCustomStep")
             elif sender == self.customStepTab.postCustomStep_listWidget:
-                self.updateListAttr(sender, "postCustomStep")
+                self.queueListAttrUpdate(sender, "postCustomStep")
             return True
         else:
             return QtWidgets.QDialog.eventFilter(self, sender, event)
 
+    def queueListAttrUpdate(self, sourceListWidget, targetAttr):
+        """Update the list attribute once the current event loop turn ends
+
+        A drag and drop reorder can send several ChildRemoved events in a
+        row. All the requests are coalesced in one updateListAttr call
+        per attribute.
+
+        Arguments:
+            sourceListWidget (QListWidget): The list widget to read from
+            targetAttr (str): The guide attribute name to update
+        """
+        self._pendingListAttr[targetAttr] = sourceListWidget
+        if not self._listAttrTimer.isActive():
+            self._listAttrTimer.start()
+
+    def _flushListAttrUpdates(self):
+        pending = self._pendingListAttr
+        self._pendingListAttr = {}
+        for targetAttr, sourceListWidget in pending.items():
+            self.updateListAttr(sourceListWidget, targetAttr)
+
+    def closeEvent(self, event):
+        # write the pending list updates while the widgets still exist
+        self._listAttrTimer.stop()
+        if self.root.exists():
+            self._flushListAttrUpdates()
+        else:
+            self._pendingListAttr = {}
+        super(guideSettings, self).closeEvent(event)
+
     # Slots ########################################################
 
     def populateAvailableSynopticTabs(self):
@@ -1251,6 +1422,21 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
         self.root.attr("skin").set(filePath)
         self.guideSettingsTab.skin_lineEdit.setText(filePath)
 
+    def _customStepContext(self, pre=True):
+        """Get the custom step attribute name and list widget
+
+        Arguments:
+            pre (bool, optional): If true returns the pre step list
+
+        Returns:
+            tuple: The guide attribute name and the QListWidget
+        """
+        if pre:
+            return ("preCustomStep",
+                    self.customStepTab.preCustomStep_listWidget)
+        return ("postCustomStep",
+                self.customStepTab.postCustomStep_listWidget)
+
     def addCustomStep(self, pre=True, *args):
         """Add a new custom step
 
@@ -1262,16 +1448,12 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
             None: None
         """
 
-        if pre:
-            stepAttr = "preCustomStep"
-            stepWidget = self.customStepTab.preCustomStep_listWidget
-        else:
-            stepAttr = "postCustomStep"
-            stepWidget = self.customStepTab.postCustomStep_listWidget
+        stepAttr, stepWidget = self._customStepContext(pre)
 
         # Check if we have a custom env for the custom steps initial folder
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            startDir = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+        customStepPath = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+        if customStepPath:
+            startDir = customStepPath
         else:
             startDir = self.root.attr(stepAttr).get()
 
@@ -1292,13 +1474,8 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
         if itemsList and not itemsList[0]:
             stepWidget.takeItem(0)
 
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            filePath = os.path.abspath(filePath)
-            baseReplace = os.path.abspath(os.environ.get(
-                MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""))
-            filePath = filePath.replace(baseReplace, "")[1:]
-
-        fileName = os.path.split(filePath)[1].split(".")[0]
+        fileName, filePath = self._processCustomStepPath(
+            filePath, _customStepBasePrefix(customStepPath))
         stepWidget.addItem(fileName + " | " + filePath)
         self.updateListAttr(stepWidget, stepAttr)
 
@@ -1313,16 +1490,12 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
             None: None
         """
 
-        if pre:
-            stepAttr = "preCustomStep"
-            stepWidget = self.customStepTab.preCustomStep_listWidget
-        else:
-            stepAttr = "postCustomStep"
-            stepWidget = self.customStepTab.postCustomStep_listWidget
+        stepAttr, stepWidget = self._customStepContext(pre)
 
         # Check if we have a custom env for the custom steps initial folder
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            startDir = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+        customStepPath = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+        if customStepPath:
+            startDir = customStepPath
         else:
             startDir = self.root.attr(stepAttr).get()
 
@@ -1337,33 +1510,8 @@ class GuideSettings(MayaQWidgetDockableMixin, QtWidgets.QDialog, HelperSlots):
         if not isinstance(filePath, basestring):
             filePath = filePath[0]
 
-        n, e = os.path.splitext(filePath)
-        stepName = os.path.split(n)[-1]
-        # raw custome step string
-        rawString = r'''
-import mgear.maya.shifter.customStep as cstp
-
-
-class CustomShifterStep(cstp.customShifterMainStep):
-    def __init__(self):
-        self.name = "%s"
-
-
-    def run(self, stepDict):
-        """Run method.
-
-            i.e:  stepDict["mgearRun"].global_ctl  gets the global_ctl from
-                    shifter rig on post step
-            i.e:  stepDict["otherCustomStepName"].ctlMesh  gets the ctlMesh
-                    from a previous custom step called "otherCustomStepName"
-        Arguments:
-            stepDict (dict): Dictionary containing the objects from
-                the previous steps
-
-        Returns:
-            None: None
-        """
-        return''' % stepName
+        stepName = _stepName(filePath)
+        rawString = CUSTOM_STEP_TEMPLATE % stepName
         f = open(filePath, 'w')
         f.write(rawString + "\n")
         f.close()
@@ -1374,13 +1522,8 @@ class CustomShifterStep(cstp.customShifterMainStep):
         if itemsList and not itemsList[0]:
             stepWidget.takeItem(0)
 
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            filePath = os.path.abspath(filePath)
-            baseReplace = os.path.abspath(os.environ.get(
-                MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""))
-            filePath = filePath.replace(baseReplace, "")[1:]
-
-        fileName = os.path.split(filePath)[1].split(".")[0]
+        fileName, filePath = self._processCustomStepPath(
+            filePath, _customStepBasePrefix(customStepPath))
         stepWidget.addItem(fileName + " | " + filePath)
         self.updateListAttr(stepWidget, stepAttr)
 
@@ -1395,22 +1538,18 @@ class CustomShifterStep(cstp.customShifterMainStep):
             None: None
         """
 
-        if pre:
-            stepAttr = "preCustomStep"
-            stepWidget = self.customStepTab.preCustomStep_listWidget
-        else:
-            stepAttr = "postCustomStep"
-            stepWidget = self.customStepTab.postCustomStep_listWidget
+        stepAttr, stepWidget = self._customStepContext(pre)
 
         # Check if we have a custom env for the custom steps initial folder
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            startDir = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+        customStepPath = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+        if customStepPath:
+            startDir = customStepPath
         else:
             startDir = self.root.attr(stepAttr).get()
 
         if stepWidget.selectedItems():
-            sourcePath = stepWidget.selectedItems()[0].text().split(
-                "|")[-1][1:]
+            sourcePath = stepPathFromText(
+                stepWidget.selectedItems()[0].text())
 
         filePath = pm.fileDialog2(
             dialogStyle=2,
@@ -1423,9 +1562,9 @@ class CustomShifterStep(cstp.customShifterMainStep):
         if not isinstance(filePath, basestring):
             filePath = filePath[0]
 
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            sourcePath = os.path.join(startDir, sourcePath)
-        shutil.copy(sourcePath, filePath)
+        sourcePath = _customStepFullPath(sourcePath, customStepPath)
+        import shutil
+        shutil.copyfile(sourcePath, filePath)
 
         # Quick clean the first empty item
         itemsList = [i.text() for i in stepWidget.findItems(
@@ -1433,13 +1572,8 @@ class CustomShifterStep(cstp.customShifterMainStep):
         if itemsList and not itemsList[0]:
             stepWidget.takeItem(0)
 
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            filePath = os.path.abspath(filePath)
-            baseReplace = os.path.abspath(os.environ.get(
-                MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""))
-            filePath = filePath.replace(baseReplace, "")[1:]
-
-        fileName = os.path.split(filePath)[1].split(".")[0]
+        fileName, filePath = self._processCustomStepPath(
+            filePath, _customStepBasePrefix(customStepPath))
         stepWidget.addItem(fileName + " | " + filePath)
         self.updateListAttr(stepWidget, stepAttr)
 
@@ -1456,10 +1590,7 @@ class CustomShifterStep(cstp.customShifterMainStep):
 
         """
 
-        if pre:
-            stepWidget = self.customStepTab.preCustomStep_listWidget
-        else:
-            stepWidget = self.customStepTab.postCustomStep_listWidget
+        _, stepWidget = self._customStepContext(pre)
 
         # Quick clean the first empty item
         itemsList = [i.text() for i in stepWidget.findItems(
@@ -1468,13 +1599,15 @@ class CustomShifterStep(cstp.customShifterMainStep):
             stepWidget.takeItem(0)
 
         # Check if we have a custom env for the custom steps initial folder
-        if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-            startDir = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
-            itemsList = [os.path.join(startDir, i.text().split("|")[-1][1:])
+        customStepPath = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+        if customStepPath:
+            startDir = customStepPath
+            itemsList = [_customStepFullPath(stepPathFromText(i.text()),
+                                             customStepPath)
                          for i in stepWidget.findItems(
                          "", QtCore.Qt.MatchContains)]
         else:
-            itemsList = [i.text().split("|")[-1][1:]
+            itemsList = [stepPathFromText(i.text())
                          for i in stepWidget.findItems(
                          "", QtCore.Qt.MatchContains)]
             if itemsList:
@@ -1485,11 +1618,19 @@ class CustomShifterStep(cstp.customShifterMainStep):
 
         stepsDict = {}
         stepsDict["itemsList"] = itemsList
-        for item in itemsList:
-            step = open(item, "r")
-            data = step.read()
-            stepsDict[item] = data
-            step.close()
+        # read the step files in parallel, custom steps are often stored
+        # in network shares
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(max(1, min(8, len(itemsList))))
+        try:
+            stepsDict.update(zip(itemsList, pool.map(_readFile, itemsList)))
+        except Exception:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
 
         data_string = json.dumps(stepsDict, indent=4, sort_keys=True)
         filePath = pm.fileDialog2(
@@ -1501,9 +1642,8 @@ class CustomShifterStep(cstp.customShifterMainStep):
             return
         if not isinstance(filePath, basestring):
             filePath = filePath[0]
-        f = open(filePath, 'w')
-        f.write(data_string)
-        f.close()
+        with open(filePath, 'w') as f:
+            f.write(data_string)
 
     def importCustomStep(self, pre=True, *args):
         """Import custom steps from a json file
@@ -1517,12 +1657,7 @@ class CustomShifterStep(cstp.customShifterMainStep):
 
         """
 
-        if pre:
-            stepAttr = "preCustomStep"
-            stepWidget = self.customStepTab.preCustomStep_listWidget
-        else:
-            stepAttr = "postCustomStep"
-            stepWidget = self.customStepTab.postCustomStep_listWidget
+        stepAttr, stepWidget = self._customStepContext(pre)
 
         # option import only paths or unpack steps
         option = pm.confirmDialog(
@@ -1534,9 +1669,10 @@ class CustomShifterStep(cstp.customShifterMainStep):
             cancelButton='Cancel',
             dismissString='Cancel')
 
+        customStepPath = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
         if option in ['Only Path', 'Unpack']:
-            if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-                startDir = os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, "")
+            if customStepPath:
+                startDir = customStepPath
             else:
                 startDir = pm.workspace(q=True, rootDirectory=True)
 
@@ -1549,7 +1685,8 @@ class CustomShifterStep(cstp.customShifterMainStep):
                 return
             if not isinstance(filePath, basestring):
                 filePath = filePath[0]
-            stepDict = json.load(open(filePath))
+            with open(filePath, "r") as f:
+                stepDict = _jsonLoader.load(f)
             stepsList = []
 
         if option == 'Only Path':
@@ -1566,40 +1703,88 @@ class CustomShifterStep(cstp.customShifterMainStep):
             if not isinstance(unPackDir, basestring):
                 unPackDir = unPackDir[0]
 
+            written = set()
             for item in stepDict["itemsList"]:
                 fileName = os.path.split(item)[1]
                 fileNewPath = os.path.join(unPackDir, fileName)
+                if item not in written:
+                    if item not in stepDict:
+                        pm.displayWarning(
+                            "The custom step source for %s is missing "
+                            "in the .scs file. Skipped" % item)
+                        continue
+                    # release each step source once it is written
+                    with open(fileNewPath, 'w') as f:
+                        f.write(stepDict.pop(item))
+                    written.add(item)
                 stepsList.append(fileNewPath)
-                f = open(fileNewPath, 'w')
-                f.write(stepDict[item])
-                f.close()
 
-        if option in ['Only Path', 'Unpack']:
+        if option in ['Only Path', 'Unpack'] and stepsList:
+            # Quick clean the first empty item
+            itemsList = [i.text() for i in stepWidget.findItems(
+                "", QtCore.Qt.MatchContains)]
+            if itemsList and not itemsList[0]:
+                stepWidget.takeItem(0)
 
+            basePrefix = _customStepBasePrefix(customStepPath)
+            newItems = []
             for item in stepsList:
-                # Quick clean the first empty item
-                itemsList = [i.text() for i in stepWidget.findItems(
-                    "", QtCore.Qt.MatchContains)]
-                if itemsList and not itemsList[0]:
-                    stepWidget.takeItem(0)
-
-                if os.environ.get(MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""):
-                    item = os.path.abspath(item)
-                    baseReplace = os.path.abspath(os.environ.get(
-                        MGEAR_SHIFTER_CUSTOMSTEP_KEY, ""))
-                    item = item.replace(baseReplace, "")[1:]
-
-                fileName = os.path.split(item)[1].split(".")[0]
-                stepWidget.addItem(fileName + " | " + item)
-                self.updateListAttr(stepWidget, stepAttr)
+                fileName, item = self._processCustomStepPath(
+                    item, basePrefix)
+                newItems.append(fileName + " | " + item)
+            stepWidget.setUpdatesEnabled(False)
+            try:
+                stepWidget.addItems(newItems)
+            finally:
+                stepWidget.setUpdatesEnabled(True)
+            # write the guide attribute once for the whole import
+            self.updateListAttr(stepWidget, stepAttr)
+
+    def _processCustomStepPath(self, filePath, basePrefix):
+        """Get the list item name and path for a custom step file
+
+        If the custom step path environment variable is set, the file path
+        is made relative to it.
+
+        Arguments:
+            filePath (str): The custom step file path
+            basePrefix (str): The custom step path prefix returned by
+                _customStepBasePrefix. Empty if the environment variable
+                is not set.
+
+        Returns:
+            tuple: The step name and the (relative) file path
+        """
+        if basePrefix:
+            filePath = _absPath(filePath)
+            baseLen = len(basePrefix)
+            # only files inside the env path are stored as relative paths
+            if os.path.normcase(filePath[:baseLen]) == basePrefix:
+                filePath = filePath[baseLen:]
+
+        fileName = _stepName(filePath)
+        return fileName, filePath
 
     def _customStepMenu(self, cs_listWidget, stepAttr, QPos):
         "right click context menu for custom step"
         currentSelection = cs_listWidget.currentItem()
         if currentSelection is None:
             return
+        if self.csMenu is None:
+            self._createCustomStepMenu()
+        # the menu actions work on the list that requested the menu
+        self._csMenuTarget = (cs_listWidget, stepAttr)
+        self.csMenu.move(cs_listWidget.mapToGlobal(QPos))
+        self.csMenu.show()
+
+    def _createCustomStepMenu(self):
+        """Create the custom step context menu
+
+        The menu is shared by the pre and post custom step lists. The
+        actions are connected once and act on the list stored in
+        _csMenuTarget.
+        """
         self.csMenu = QtWidgets.QMenu()
-        parentPosition = cs_listWidget.mapToGlobal(QtCore.QPoint(0, 0))
         menu_item_01 = self.csMenu.addAction("Toggle Custom Step")
         self.csMenu.addSeparator()
         menu_item_02 = self.csMenu.addAction("Turn OFF Selected")
@@ -1608,30 +1793,27 @@ class CustomShifterStep(cstp.customShifterMainStep):
         menu_item_04 = self.csMenu.addAction("Turn OFF All")
         menu_item_05 = self.csMenu.addAction("Turn ON All")
 
-        menu_item_01.triggered.connect(partial(self.toggleStatusCustomStep,
-                                               cs_listWidget,
-                                               stepAttr))
-        menu_item_02.triggered.connect(partial(self.setStatusCustomStep,
-                                               cs_listWidget,
-                                               stepAttr,
-                                               False))
-        menu_item_03.triggered.connect(partial(self.setStatusCustomStep,
-                                               cs_listWidget,
-                                               stepAttr,
+        menu_item_01.triggered.connect(self._csMenuToggleStatus)
+        menu_item_02.triggered.connect(partial(self._csMenuSetStatus,
+                                               False,
                                                True))
-        menu_item_04.triggered.connect(partial(self.setStatusCustomStep,
-                                               cs_listWidget,
-                                               stepAttr,
+        menu_item_03.triggered.connect(partial(self._csMenuSetStatus,
+                                               True,
+                                               True))
+        menu_item_04.triggered.connect(partial(self._csMenuSetStatus,
                                                False,
                                                False))
-        menu_item_05.triggered.connect(partial(self.setStatusCustomStep,
-                                               cs_listWidget,
-                                               stepAttr,
+        menu_item_05.triggered.connect(partial(self._csMenuSetStatus,
                                                True,
                                                False))
 
-        self.csMenu.move(parentPosition + QPos)
-        self.csMenu.show()
+    def _csMenuToggleStatus(self, *args):
+        cs_listWidget, stepAttr = self._csMenuTarget
+        self.toggleStatusCustomStep(cs_listWidget, stepAttr)
+
+    def _csMenuSetStatus(self, status, selected, *args):
+        cs_listWidget, stepAttr = self._csMenuTarget
+        self.setStatusCustomStep(cs_listWidget, stepAttr, status, selected)
 
     def preCustomStepMenu(self, QPos):
         self._customStepMenu(self.customStepTab.preCustomStep_listWidget,
@@ -1661,18 +1843,29 @@ class CustomShifterStep(cstp.customShifterMainStep):
             items = cs_listWidget.selectedItems()
         else:
             items = self.getAllItems(cs_listWidget)
+        changed = False
         for item in items:
             off = item.text().startswith("*")
-            if status and off:
+            # skip the items that already have the requested status
+            if status != off:
+                continue
+            if status:
                 item.setText(item.text()[1:])
-            elif not status and not off:
+            else:
                 item.setText("*" + item.text())
             self.setStatusColor(item)
-        self.updateListAttr(cs_listWidget, stepAttr)
+            changed = True
+        if changed:
+            self.updateListAttr(cs_listWidget, stepAttr)
 
     def getAllItems(self, cs_listWidget):
         return [cs_listWidget.item(i) for i in range(cs_listWidget.count())]
 
+    def iterAllItems(self, cs_listWidget):
+        """Iterate the list widget items without building a list"""
+        for i in range(cs_listWidget.count()):
+            yield cs_listWidget.item(i)
+
     def setStatusColor(self, item):
         if item.text().startswith("*"):
             item.setForeground(self.redBrush)
@@ -1680,18 +1873,24 @@ class CustomShifterStep(cstp.customShifterMainStep):
             item.setForeground(self.whiteDownBrush)
 
     def refreshStatusColor(self, cs_listWidget):
-        items = self.getAllItems(cs_listWidget)
-        for i in items:
+        for i in self.iterAllItems(cs_listWidget):
             self.setStatusColor(i)
 
     # Highligter filter
     def _highlightSearch(self, cs_listWidget, searchText):
-        items = self.getAllItems(cs_listWidget)
-        for i in items:
-            if searchText and searchText.lower() in i.text().lower():
-                i.setBackground(QtGui.QColor(128, 128, 128, 255))
+        searchText = searchText.lower()
+        if self._lastSearch.get(cs_listWidget) == searchText:
+            return
+        self._lastSearch[cs_listWidget] = searchText
+        for i in self.iterAllItems(cs_listWidget):
+            match = bool(searchText) and searchText in i.text().lower()
+            # only repaint the items that change highlight state
+            if match == (i.background().color() == self.highlightColor):
+                continue
+            if match:
+                i.setBackground(self.highlightColor)
             else:
-                i.setBackground(QtGui.QColor(255, 255, 255, 0))
+                i.setBackground(self.clearColor)
 
     def preHighlightSearch(self):
         searchText = self.customStepTab.preSearch_lineEdit.text()